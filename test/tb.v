@@ -7,8 +7,11 @@
 module tb ();
 
   // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+  // Pass +VCD=<file> to write it somewhere else (used by `make parallel`).
+  reg [8*64-1:0] vcd_file;
   initial begin
-    $dumpfile("tb.vcd");
+    if (!$value$plusargs("VCD=%s", vcd_file)) vcd_file = "tb.vcd";
+    $dumpfile(vcd_file);
     $dumpvars(0, tb);
     #1;
   end
@@ -46,4 +49,22 @@ module tb ();
       .rst_n  (rst_n)     // not reset
   );
 
+  // One-bit taps of each PWM channel so the cocotb test can wait on a single output:
+  wire pwm_bit_0  = uo_out[0];
+  wire pwm_bit_1  = uo_out[1];
+  wire pwm_bit_2  = uo_out[2];
+  wire pwm_bit_3  = uo_out[3];
+  wire pwm_bit_4  = uo_out[4];
+  wire pwm_bit_5  = uo_out[5];
+  wire pwm_bit_6  = uo_out[6];
+  wire pwm_bit_7  = uo_out[7];
+  wire pwm_bit_8  = uio_out[0];
+  wire pwm_bit_9  = uio_out[1];
+  wire pwm_bit_10 = uio_out[2];
+  wire pwm_bit_11 = uio_out[3];
+  wire pwm_bit_12 = uio_out[4];
+  wire pwm_bit_13 = uio_out[5];
+  wire pwm_bit_14 = uio_out[6];
+  wire pwm_bit_15 = uio_out[7];
+
 endmodule